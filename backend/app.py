@@ -1,7 +1,12 @@
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from flask import Flask, request, jsonify, send_file
+from flask.json.provider import JSONProvider
+import orjson
 import tensorflow as tf
-from tensorflow.keras.preprocessing import image
 import numpy as np
 import json
 from PIL import Image
@@ -9,11 +14,12 @@ import io
 from nutrition_extraction import extract_nutrition
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from flask_cors import CORS
 from serial_reader import SerialReader, ARDUINO_CONFIG
-import base64
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import pybase64
+import hashlib
+from collections import OrderedDict
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -29,9 +35,129 @@ SMTP_USERNAME = os.getenv('SMTP_USERNAME')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
 SENDER_EMAIL = os.getenv('SENDER_EMAIL')
 
+class OrjsonProvider(JSONProvider):
+    """Back jsonify and request parsing with orjson's C encoder."""
+    def dumps(self, obj, **kwargs):
+        # OPT_SERIALIZE_NUMPY lets numpy scalars (e.g. model confidences)
+        # pass through without an explicit float() cast at every call site
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for all routes
 
+# Shared HTTP session so Gemini calls reuse pooled TLS connections
+# instead of paying a fresh TCP+TLS handshake on every request.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                       max_retries=Retry(total=2, backoff_factor=0.2,
+                                         status_forcelist=[502, 503, 504]))
+_SESSION.mount('https://', _adapter)
+_SESSION.mount('http://', _adapter)
+
+# Pool used to fire Gemini calls while the local fallback runs in
+# parallel, instead of paying full Gemini latency before falling back.
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=8)
+GEMINI_DEADLINE_S = 8.0
+
+# Small pool for fire-and-forget disk writes so they overlap with inference
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+
+class TokenBucket:
+    """Thread-safe token bucket used to cap upstream request rates."""
+    def __init__(self, capacity, refill_rate_per_sec):
+        self.capacity = capacity
+        self.refill_rate = refill_rate_per_sec
+        self.tokens = float(capacity)
+        self.last_refill = time.time()
+        self.lock = threading.Lock()
+
+    def consume(self, tokens=1):
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.last_refill) * self.refill_rate)
+            self.last_refill = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+# Gemini's free tier allows ~15 requests/minute; throttling locally makes
+# bursts fall straight back to the local model instead of queueing on 429s.
+_gemini_bucket = TokenBucket(capacity=10, refill_rate_per_sec=0.25)
+
+class CircuitBreaker:
+    """Closed/Open/HalfOpen breaker so Gemini outages fail fast.
+
+    After enough failures inside the window the breaker opens and callers
+    skip Gemini entirely (falling back to the local path) instead of each
+    eating the full request timeout. After the open period one probe is
+    admitted; its outcome decides whether the breaker closes again.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold=5, failure_window_s=30.0, open_timeout_s=60.0):
+        self.failure_threshold = failure_threshold
+        self.failure_window_s = failure_window_s
+        self.open_timeout_s = open_timeout_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.first_failure_time = 0.0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at >= self.open_timeout_s:
+                    self.state = self.HALF_OPEN
+                    return True  # admit a single probe
+                return False
+            if self.state == self.HALF_OPEN:
+                return False  # a probe is already in flight
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            now = time.time()
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = now
+                return
+            if now - self.first_failure_time > self.failure_window_s:
+                self.failures = 0
+                self.first_failure_time = now
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = now
+
+_gemini_breaker = CircuitBreaker()
+
+def _parse_gemini_json(response):
+    """Pull the first JSON object out of a Gemini generateContent response."""
+    try:
+        doc = orjson.loads(response.content)
+        text = doc['candidates'][0]['content']['parts'][0]['text']
+        # str.find/rfind are tight C loops, unlike the old '{.*}' regex
+        # which backtracked across the whole reply when no object existed
+        start = text.find('{')
+        end = text.rfind('}')
+        if start != -1 and end > start:
+            return orjson.loads(text[start:end + 1])
+    except Exception as e:
+        print(f"Error parsing Gemini response: {e}")
+    return None
+
 # Initialize serial reader as a global singleton
 serial_reader = None
 
@@ -43,22 +169,135 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 IMG_HEIGHT, IMG_WIDTH = 128, 128
+
+# Hard cap on uploaded frame size: a miscalibrated or malicious client
+# can't make PIL decode a multi-megapixel image just to shrink it to
+# 128x128. Also arms Pillow's own decompression-bomb check.
+MAX_UPLOAD_PIXELS = 2_000_000
+Image.MAX_IMAGE_PIXELS = MAX_UPLOAD_PIXELS
+
 model = None
+_predict_fn = None
+interpreter = None
+_input_details = None
+_output_details = None
 idx_to_class = {}
 class_indices = {}
+_SPOILAGE_STATUS = {}
+
+# TFLite interpreters are not thread-safe, so invocation is serialized.
+_INTERPRETER_LOCK = threading.Lock()
+
+# Per-thread preprocessing buffer: each request thread normalizes into its
+# own reusable float32 plane, so no lock is needed around preprocessing and
+# nothing is allocated per prediction.
+_TLS = threading.local()
+
+def _thread_input_buf():
+    buf = getattr(_TLS, 'input_buf', None)
+    if buf is None:
+        buf = _TLS.input_buf = np.empty((IMG_HEIGHT, IMG_WIDTH, 3), dtype=np.float32)
+    return buf
+
+# Request-coalescing batcher for the Keras path: concurrent predictions
+# are grouped into one model call instead of N batch-of-one calls.
+MAX_BATCH = 16
+BATCH_WAIT_S = 0.002
+_batch_queue = queue.Queue()
+
+def _batch_worker():
+    while True:
+        batch = [_batch_queue.get()]
+        deadline = time.time() + BATCH_WAIT_S
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_batch_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        arrays, futures = zip(*batch)
+        try:
+            if len(arrays) == 1:
+                # Common case: a no-copy view of the caller's buffer; the
+                # caller stays blocked on its future until we're done with it
+                batch_input = arrays[0][np.newaxis, ...]
+            else:
+                batch_input = np.stack(arrays)
+            # The concrete function converts the NumPy batch itself; wrapping
+            # it in tf.constant first just adds an extra Python-level copy.
+            outputs = _predict_fn(batch_input).numpy()
+            for fut, row in zip(futures, outputs):
+                fut.set_result(row)
+        except Exception as e:
+            for fut in futures:
+                fut.set_exception(e)
 
 LATEST_IMAGE_PATH = 'latest_esp32.jpg'
 
+# Latest ESP32 frame mirrored in RAM so prediction polls skip the disk read
+_latest_image_bytes = None
+_latest_image_lock = threading.Lock()
+
+def _write_latest_image(image_bytes):
+    try:
+        with open(LATEST_IMAGE_PATH, 'wb') as f:
+            f.write(image_bytes)
+    except Exception as e:
+        print(f"Error writing {LATEST_IMAGE_PATH}: {e}")
+
 # --- Model and Class Loading Function ---
 def load_ml_assets():
-    global model, idx_to_class, class_indices
+    global model, _predict_fn, interpreter, _input_details, _output_details
+    global idx_to_class, class_indices, _SPOILAGE_STATUS
     MODEL_PATH = 'food_spoilage_multi_class_detector_model.h5'
     try:
         model = tf.keras.models.load_model(MODEL_PATH)
+        # Pre-trace a concrete function once so requests skip model.predict's
+        # Python-level batching/callback machinery and never retrace.
+        # jit_compile lets XLA fuse the Conv+BN+ReLU chains into single
+        # kernels when this fallback path serves traffic.
+        _predict_fn = tf.function(
+            lambda x: model(x, training=False), jit_compile=True
+        ).get_concrete_function(tf.TensorSpec([None, IMG_HEIGHT, IMG_WIDTH, 3], tf.float32))
+        threading.Thread(target=_batch_worker, daemon=True).start()
         print(f"Model loaded successfully from {MODEL_PATH}")
     except Exception as e:
         print(f"Error loading model: {e}. Ensure '{MODEL_PATH}' exists.")
         model = None
+        _predict_fn = None
+    TFLITE_PATH = 'food_spoilage_multi_class_detector_model.tflite'
+    if os.path.exists(TFLITE_PATH):
+        # Prefer the INT8-quantized model produced by convert_model_int8.py:
+        # 4x smaller weights and int8 dot-product kernels on CPU.
+        try:
+            interpreter = tf.lite.Interpreter(model_path=TFLITE_PATH,
+                                              num_threads=os.cpu_count())
+            interpreter.allocate_tensors()
+            _input_details = interpreter.get_input_details()
+            _output_details = interpreter.get_output_details()
+            print(f"Quantized TFLite model loaded from {TFLITE_PATH}")
+        except Exception as e:
+            print(f"Error loading {TFLITE_PATH}: {e}. Converting in-process instead.")
+            interpreter = None
+    if model is not None and interpreter is None:
+        # Convert to TFLite for CPU inference: the XNNPACK kernels are
+        # SIMD-vectorized and much faster than the Keras graph for a model
+        # this size. Falls back to the concrete function if conversion fails.
+        try:
+            converter = tf.lite.TFLiteConverter.from_keras_model(model)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            tflite_bytes = converter.convert()
+            interpreter = tf.lite.Interpreter(model_content=tflite_bytes,
+                                              num_threads=os.cpu_count())
+            interpreter.allocate_tensors()
+            _input_details = interpreter.get_input_details()
+            _output_details = interpreter.get_output_details()
+            print("TFLite interpreter ready for CPU inference")
+        except Exception as e:
+            print(f"TFLite conversion failed: {e}. Using the Keras model directly.")
+            interpreter = None
     CLASSES_JSON_PATH = 'dataset_classes.json'
     if os.path.exists(CLASSES_JSON_PATH):
         try:
@@ -80,6 +319,10 @@ def load_ml_assets():
         ]
         class_indices = {label: i for i, label in enumerate(all_class_names)}
         idx_to_class = {i: label for i, label in enumerate(all_class_names)}
+    # Precompute the class -> Fresh/Spoiled mapping so the hot path does a
+    # dict lookup instead of lowercasing the label on every prediction
+    _SPOILAGE_STATUS = {i: ("Spoiled" if "rotten" in name.lower() else "Fresh")
+                        for i, name in idx_to_class.items()}
 
 with app.app_context():
     load_ml_assets()
@@ -87,20 +330,61 @@ with app.app_context():
 # Initialize serial reader when app starts
 get_serial_reader()
 
-def predict_image_from_bytes(image_bytes):
-    if model is None:
+def predict_image_from_bytes(image_source):
+    """Run the local classifier on raw JPEG bytes or a file-like object.
+
+    Accepting a stream (e.g. werkzeug's FileStorage.stream) lets callers
+    feed the decoder directly without materializing the upload in RAM.
+    """
+    if model is None and interpreter is None:
         return "Model Not Loaded", 0.0, "error"
     try:
-        img = Image.open(io.BytesIO(image_bytes))
-        img = img.resize((IMG_WIDTH, IMG_HEIGHT))
-        img_array = image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array /= 255.0
-        predictions = model.predict(img_array)[0]
+        if hasattr(image_source, 'read'):
+            image_source.seek(0)
+            img = Image.open(image_source)
+        else:
+            img = Image.open(io.BytesIO(image_source))
+        # Let libjpeg decode at a reduced DCT scale instead of walking every
+        # native-resolution pixel. draft never under-shoots: it picks the
+        # smallest 1/2, 1/4 or 1/8 scale still at least the requested size,
+        # so targeting the model size directly maximizes the decode saving.
+        img.draft('RGB', (IMG_WIDTH, IMG_HEIGHT))
+        img = img.convert('RGB').resize((IMG_WIDTH, IMG_HEIGHT), Image.BILINEAR)
+        if interpreter is not None:
+            # Tensor details are cached at load time; fetching them per call
+            # rebuilds dicts through the TFLite C API.
+            input_details = _input_details
+            output_details = _output_details
+            if input_details[0]['dtype'] == np.uint8:
+                # Quantized model takes raw pixels; normalization is folded
+                # into its input quantization parameters.
+                arr = np.asarray(img, dtype=np.uint8)[np.newaxis, ...]
+            else:
+                buf = _thread_input_buf()
+                np.multiply(np.asarray(img, dtype=np.uint8), np.float32(1.0 / 255.0),
+                            out=buf, dtype=np.float32)
+                arr = buf[np.newaxis, ...]
+            with _INTERPRETER_LOCK:
+                interpreter.set_tensor(input_details[0]['index'], arr)
+                interpreter.invoke()
+                predictions = interpreter.get_tensor(output_details[0]['index'])[0]
+            if output_details[0]['dtype'] == np.uint8:
+                scale, zero_point = output_details[0]['quantization']
+                predictions = (predictions.astype(np.float32) - zero_point) * scale
+        else:
+            # Fused normalization into this thread's buffer. Handing the
+            # buffer to the batch worker is safe because we block on the
+            # future below and np.stack copies it into the batch.
+            buf = _thread_input_buf()
+            np.multiply(np.asarray(img, dtype=np.uint8), np.float32(1.0 / 255.0),
+                        out=buf, dtype=np.float32)
+            fut = Future()
+            _batch_queue.put((buf, fut))
+            predictions = fut.result(timeout=10)
         predicted_class_idx = np.argmax(predictions)
         predicted_label_raw = idx_to_class.get(predicted_class_idx, "Unknown")
         confidence = predictions[predicted_class_idx]
-        spoilage_status = "Spoiled" if "rotten" in predicted_label_raw.lower() else "Fresh"
+        spoilage_status = _SPOILAGE_STATUS.get(int(predicted_class_idx), "Fresh")
         return predicted_label_raw, float(confidence), spoilage_status
     except Exception as e:
         print(f"Error during image prediction: {e}")
@@ -109,8 +393,11 @@ def predict_image_from_bytes(image_bytes):
 def predict_with_gemini(image_bytes):
     if not GEMINI_API_KEY or not GEMINI_API_URL:
         return None
+    if not _gemini_bucket.consume() or not _gemini_breaker.allow():
+        return None
     try:
-        img_b64 = base64.b64encode(image_bytes).decode('utf-8')
+        # SIMD base64 straight to str, skipping the bytes->str decode copy
+        img_b64 = pybase64.b64encode_as_string(image_bytes)
         payload = {
             "contents": [
                 {
@@ -121,24 +408,63 @@ def predict_with_gemini(image_bytes):
                 }
             ]
         }
-        response = requests.post(GEMINI_API_URL, json=payload)
+        response = _SESSION.post(GEMINI_API_URL, json=payload, timeout=(3, 30))
         if response.status_code == 200:
-            try:
-                # Try to extract the JSON from the Gemini response
-                import re, json as pyjson
-                text = response.json()['candidates'][0]['content']['parts'][0]['text']
-                match = re.search(r'\{.*\}', text, re.DOTALL)
-                if match:
-                    gemini_result = pyjson.loads(match.group(0))
-                    return gemini_result
-            except Exception as e:
-                print(f"Error parsing Gemini response: {e}")
+            _gemini_breaker.record_success()
+            gemini_result = _parse_gemini_json(response)
+            if gemini_result is not None:
+                return gemini_result
         else:
+            _gemini_breaker.record_failure()
             print(f"Gemini API error: {response.status_code} {response.text}")
     except Exception as e:
+        _gemini_breaker.record_failure()
         print(f"Error calling Gemini API: {e}")
     return None
 
+# Memoized predictions keyed by a fast hash of the JPEG bytes, so polling
+# an unchanged frame skips both the Gemini round trip and the local model.
+_PRED_CACHE = OrderedDict()
+_PRED_CACHE_MAX = 64
+_pred_cache_lock = threading.Lock()
+
+def run_hedged_prediction(image_bytes):
+    """Race Gemini against the local model and prefer Gemini if it lands in time."""
+    cache_key = hashlib.blake2b(image_bytes, digest_size=8).digest()
+    with _pred_cache_lock:
+        cached = _PRED_CACHE.get(cache_key)
+        if cached is not None:
+            _PRED_CACHE.move_to_end(cache_key)
+            return cached
+    gemini_future = _HEDGE_POOL.submit(predict_with_gemini, image_bytes)
+    # Run the local model while Gemini is in flight instead of after it fails
+    raw_prediction, confidence, spoilage_status = predict_image_from_bytes(image_bytes)
+    try:
+        gemini_result = gemini_future.result(timeout=GEMINI_DEADLINE_S)
+    except FutureTimeoutError:
+        gemini_result = None
+    if gemini_result and 'predictedClass' in gemini_result and 'confidence' in gemini_result:
+        result = {
+            "status": "success",
+            "foodItemName": gemini_result.get('foodItemName', 'Unknown'),
+            "predictedClass": gemini_result['predictedClass'],
+            "confidence": float(gemini_result['confidence']) * 100,
+            "source": "gemini"
+        }
+    else:
+        result = {
+            "status": "success",
+            "predictedClass": raw_prediction,
+            "confidence": float(confidence) * 100,
+            "spoilage_status": spoilage_status,
+            "source": "local"
+        }
+    with _pred_cache_lock:
+        _PRED_CACHE[cache_key] = result
+        if len(_PRED_CACHE) > _PRED_CACHE_MAX:
+            _PRED_CACHE.popitem(last=False)
+    return result
+
 @app.route('/')
 def index():
     return jsonify({"status": "ok", "message": "Food Spoilage Detection Backend"})
@@ -151,72 +477,54 @@ def predict_from_esp32():
     if file.filename == '':
         return jsonify({"status": "error", "message": "No selected file"}), 400
     if file:
+        global _latest_image_bytes
         image_bytes = file.read()
-        # Save the latest image for frontend display
-        with open(LATEST_IMAGE_PATH, 'wb') as f:
-            f.write(image_bytes)
-        # Try Gemini API first
-        gemini_result = predict_with_gemini(image_bytes)
-        if gemini_result and 'predictedClass' in gemini_result and 'confidence' in gemini_result:
-            response_data = {
-                "status": "success",
-                "foodItemName": gemini_result.get('foodItemName', 'Unknown'),
-                "predictedClass": gemini_result['predictedClass'],
-                "confidence": float(gemini_result['confidence']) * 100,
-                "source": "gemini"
-            }
-            return jsonify(response_data)
-        # Fallback to local model
-        raw_prediction, confidence, spoilage_status = predict_image_from_bytes(image_bytes)
-        response_data = {
-            "status": "success",
-            "predictedClass": raw_prediction,
-            "confidence": float(confidence) * 100,
-            "spoilage_status": spoilage_status,
-            "source": "local"
-        }
-        return jsonify(response_data)
+        # Cheap header peek (no pixel decode) to bounce oversized frames
+        # before they reach the cache, disk, Gemini or the model
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as probe:
+                width, height = probe.size
+        except Exception:
+            return jsonify({"status": "error", "message": "Invalid image format"}), 400
+        if width * height > MAX_UPLOAD_PIXELS:
+            return jsonify({"status": "error", "message": "Image too large"}), 413
+        with _latest_image_lock:
+            _latest_image_bytes = image_bytes
+        # Persist the frame for restarts in the background; the disk write
+        # overlaps with the model/Gemini work instead of preceding it
+        _IO_POOL.submit(_write_latest_image, image_bytes)
+        # Gemini and the local model run in parallel; Gemini wins ties
+        return jsonify(run_hedged_prediction(image_bytes))
     else:
         return jsonify({"status": "error", "message": "Invalid image format"}), 400
 
 @app.route('/latest_esp32_image')
 def latest_esp32_image():
+    with _latest_image_lock:
+        image_bytes = _latest_image_bytes
+    if image_bytes is not None:
+        return send_file(io.BytesIO(image_bytes), mimetype='image/jpeg')
     try:
+        # Nothing received since startup; serve whatever survived on disk
         return send_file(LATEST_IMAGE_PATH, mimetype='image/jpeg')
     except Exception as e:
         return jsonify({'status': 'error', 'message': 'No image available'}), 404
 
 @app.route('/get_latest_prediction_result', methods=['GET'])
 def get_latest_prediction_result():
-    if not os.path.exists(LATEST_IMAGE_PATH):
+    with _latest_image_lock:
+        image_bytes = _latest_image_bytes
+    if image_bytes is None and not os.path.exists(LATEST_IMAGE_PATH):
         return jsonify({"status": "error", "message": "No image has been received from ESP32 yet."}), 404
 
     try:
-        with open(LATEST_IMAGE_PATH, 'rb') as f:
-            image_bytes = f.read()
-
-        # Try Gemini API first
-        gemini_result = predict_with_gemini(image_bytes)
-        if gemini_result and 'predictedClass' in gemini_result and 'confidence' in gemini_result:
-            response_data = {
-                "status": "success",
-                "foodItemName": gemini_result.get('foodItemName', 'Unknown'),
-                "predictedClass": gemini_result['predictedClass'],
-                "confidence": float(gemini_result['confidence']) * 100,
-                "source": "gemini"
-            }
-            return jsonify(response_data)
+        if image_bytes is None:
+            # First poll after a restart: fall back to the frame on disk
+            with open(LATEST_IMAGE_PATH, 'rb') as f:
+                image_bytes = f.read()
 
-        # Fallback to local model
-        raw_prediction, confidence, spoilage_status = predict_image_from_bytes(image_bytes)
-        response_data = {
-            "status": "success",
-            "predictedClass": raw_prediction,
-            "confidence": float(confidence) * 100,
-            "spoilage_status": spoilage_status,
-            "source": "local"
-        }
-        return jsonify(response_data)
+        # Gemini and the local model run in parallel; Gemini wins ties
+        return jsonify(run_hedged_prediction(image_bytes))
 
     except Exception as e:
         print(f"Error processing latest image for prediction: {e}")
@@ -225,6 +533,8 @@ def get_latest_prediction_result():
 def analyze_nutrition_with_gemini(text):
     if not GEMINI_API_KEY or not GEMINI_API_URL:
         return None
+    if not _gemini_bucket.consume() or not _gemini_breaker.allow():
+        return None
     try:
         prompt = """Analyze this nutrition label text and extract ALL nutrition values present in the label. Return the data in this JSON format:
         {
@@ -268,19 +578,17 @@ def analyze_nutrition_with_gemini(text):
                 }
             ]
         }
-        response = requests.post(GEMINI_API_URL, json=payload)
+        response = _SESSION.post(GEMINI_API_URL, json=payload, timeout=(3, 30))
         if response.status_code == 200:
-            try:
-                text = response.json()['candidates'][0]['content']['parts'][0]['text']
-                import re, json as pyjson
-                match = re.search(r'\{.*\}', text, re.DOTALL)
-                if match:
-                    return pyjson.loads(match.group(0))
-            except Exception as e:
-                print(f"Error parsing Gemini nutrition response: {e}")
+            _gemini_breaker.record_success()
+            gemini_result = _parse_gemini_json(response)
+            if gemini_result is not None:
+                return gemini_result
         else:
+            _gemini_breaker.record_failure()
             print(f"Gemini API error: {response.status_code} {response.text}")
     except Exception as e:
+        _gemini_breaker.record_failure()
         print(f"Error calling Gemini API for nutrition: {e}")
     return None
 
@@ -291,18 +599,22 @@ def extract_nutrition_api():
         return jsonify({'status': 'error', 'message': 'No text provided'}), 400
     
     text = data['text']
-    
-    # Try Gemini API first
-    gemini_result = analyze_nutrition_with_gemini(text)
+
+    # Run Gemini and the local extractor concurrently; prefer Gemini if it
+    # answers within the deadline
+    gemini_future = _HEDGE_POOL.submit(analyze_nutrition_with_gemini, text)
+    nutrition = extract_nutrition(text)
+    try:
+        gemini_result = gemini_future.result(timeout=GEMINI_DEADLINE_S)
+    except FutureTimeoutError:
+        gemini_result = None
     if gemini_result:
         return jsonify({
             'status': 'success',
             'nutrition': gemini_result,
             'source': 'gemini'
         })
-    
-    # Fallback to local extraction
-    nutrition = extract_nutrition(text)
+
     return jsonify({
         'status': 'success',
         'nutrition': nutrition,
@@ -349,6 +661,73 @@ def set_port():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _send_messages(msgs):
+    """Send prepared messages over a single SMTP connection.
+
+    One starttls + login is amortized across the whole batch instead of
+    paying a TLS handshake and AUTH round trip per message.
+    """
+    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+        server.starttls()
+        server.login(SMTP_USERNAME, SMTP_PASSWORD)
+        for msg in msgs:
+            server.send_message(msg)
+
+def _build_nutrition_msg(recipient_email, nutrition_data):
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = recipient_email
+    msg['Subject'] = 'Your Nutrition Analysis Results'
+
+    # Build list sections once with str.join on lists; join consumes a list
+    # in one pass instead of growing a string item by item
+    benefits_html = ''.join([f'<li>{benefit}</li>' for benefit in nutrition_data.get('benefits', [])])
+    warnings_html = ''.join([f'<li>{warning}</li>' for warning in nutrition_data.get('warnings', [])])
+
+    # Create HTML content
+    html_content = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <h2 style="color: #2e7d32;">Nutrition Analysis Results</h2>
+
+        <div style="background-color: #f5f5f5; padding: 20px; border-radius: 8px; margin: 20px 0;">
+            <h3 style="color: #1b5e20;">Health Score: {nutrition_data.get('health_score', 'N/A')}/10</h3>
+
+            <h4>Main Nutrients:</h4>
+            <ul>
+                <li>Calories: {nutrition_data.get('calories', 'N/A')}</li>
+                <li>Protein: {nutrition_data.get('protein', 'N/A')}g</li>
+                <li>Carbohydrates: {nutrition_data.get('carbs', 'N/A')}g</li>
+                <li>Fat: {nutrition_data.get('fat', 'N/A')}g</li>
+                <li>Fiber: {nutrition_data.get('fiber', 'N/A')}g</li>
+                <li>Sugar: {nutrition_data.get('sugar', 'N/A')}g</li>
+                <li>Sodium: {nutrition_data.get('sodium', 'N/A')}mg</li>
+            </ul>
+
+            <h4>Serving Size:</h4>
+            <p>{nutrition_data.get('serving_size', 'N/A')}</p>
+
+            <h4>Health Benefits:</h4>
+            <ul>
+                {benefits_html}
+            </ul>
+
+            <h4>Warnings:</h4>
+            <ul>
+                {warnings_html}
+            </ul>
+        </div>
+
+        <p style="color: #666; font-size: 0.9em;">
+            This analysis was performed using Fresh Eye's advanced nutrition analysis system.
+        </p>
+    </body>
+    </html>
+    """
+
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
 @app.route('/send_email', methods=['POST'])
 def send_email():
     try:
@@ -356,63 +735,8 @@ def send_email():
         if not data or 'email' not in data or 'nutritionData' not in data:
             return jsonify({'status': 'error', 'message': 'Missing required data'}), 400
 
-        recipient_email = data['email']
-        nutrition_data = data['nutritionData']
-
-        # Create email message
-        msg = MIMEMultipart()
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = recipient_email
-        msg['Subject'] = 'Your Nutrition Analysis Results'
-
-        # Create HTML content
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <h2 style="color: #2e7d32;">Nutrition Analysis Results</h2>
-            
-            <div style="background-color: #f5f5f5; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                <h3 style="color: #1b5e20;">Health Score: {nutrition_data.get('health_score', 'N/A')}/10</h3>
-                
-                <h4>Main Nutrients:</h4>
-                <ul>
-                    <li>Calories: {nutrition_data.get('calories', 'N/A')}</li>
-                    <li>Protein: {nutrition_data.get('protein', 'N/A')}g</li>
-                    <li>Carbohydrates: {nutrition_data.get('carbs', 'N/A')}g</li>
-                    <li>Fat: {nutrition_data.get('fat', 'N/A')}g</li>
-                    <li>Fiber: {nutrition_data.get('fiber', 'N/A')}g</li>
-                    <li>Sugar: {nutrition_data.get('sugar', 'N/A')}g</li>
-                    <li>Sodium: {nutrition_data.get('sodium', 'N/A')}mg</li>
-                </ul>
-
-                <h4>Serving Size:</h4>
-                <p>{nutrition_data.get('serving_size', 'N/A')}</p>
-
-                <h4>Health Benefits:</h4>
-                <ul>
-                    {''.join(f'<li>{benefit}</li>' for benefit in nutrition_data.get('benefits', []))}
-                </ul>
-
-                <h4>Warnings:</h4>
-                <ul>
-                    {''.join(f'<li>{warning}</li>' for warning in nutrition_data.get('warnings', []))}
-                </ul>
-            </div>
-
-            <p style="color: #666; font-size: 0.9em;">
-                This analysis was performed using Fresh Eye's advanced nutrition analysis system.
-            </p>
-        </body>
-        </html>
-        """
-
-        msg.attach(MIMEText(html_content, 'html'))
-
-        # Connect to SMTP server and send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.send_message(msg)
+        msg = _build_nutrition_msg(data['email'], data['nutritionData'])
+        _send_messages([msg])
 
         return jsonify({'status': 'success', 'message': 'Email sent successfully'})
 
@@ -421,4 +745,6 @@ def send_email():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=False) 
\ No newline at end of file
+    # threaded=True keeps concurrent requests in flight so the prediction
+    # batcher has something to coalesce
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
\ No newline at end of file
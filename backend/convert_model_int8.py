@@ -0,0 +1,69 @@
+"""One-time INT8 quantization of the spoilage classifier.
+
+Converts food_spoilage_multi_class_detector_model.h5 to a fully
+quantized .tflite model using post-training quantization. The backend
+picks the .tflite file up automatically on the next start.
+
+Usage:
+    python convert_model_int8.py <folder_with_sample_images>
+
+The sample folder should hold ~100 representative JPEGs (e.g. a slice
+of the training set or saved ESP32 captures) so the converter can
+calibrate activation ranges.
+"""
+import os
+import sys
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+
+IMG_HEIGHT, IMG_WIDTH = 128, 128
+MODEL_PATH = 'food_spoilage_multi_class_detector_model.h5'
+TFLITE_PATH = 'food_spoilage_multi_class_detector_model.tflite'
+
+
+def representative_dataset(sample_dir, limit=100):
+    def gen():
+        count = 0
+        for name in sorted(os.listdir(sample_dir)):
+            if count >= limit:
+                break
+            path = os.path.join(sample_dir, name)
+            try:
+                img = Image.open(path).convert('RGB').resize((IMG_WIDTH, IMG_HEIGHT))
+            except Exception:
+                continue
+            # Same preprocessing the backend applies at serve time
+            arr = np.asarray(img, dtype=np.float32) / 255.0
+            yield [arr[np.newaxis, ...]]
+            count += 1
+        if count == 0:
+            raise RuntimeError(f"No readable images found in {sample_dir}")
+    return gen
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    sample_dir = sys.argv[1]
+
+    model = tf.keras.models.load_model(MODEL_PATH)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset(sample_dir)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    # uint8 in/out lets the backend feed raw pixels with no /255 pass
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    tflite_bytes = converter.convert()
+
+    with open(TFLITE_PATH, 'wb') as f:
+        f.write(tflite_bytes)
+    original_mb = os.path.getsize(MODEL_PATH) / 1e6
+    quantized_mb = len(tflite_bytes) / 1e6
+    print(f"Wrote {TFLITE_PATH}: {original_mb:.1f} MB -> {quantized_mb:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,58 @@
-from transformers import pipeline
 import re
 from typing import Dict, List, Union, Optional
 
+# All patterns are compiled once at import so extraction never pays the
+# per-call compile/cache lookup for the ~40 searches a label can trigger.
+_NONNUM_RE = re.compile(r'[^\d.]')
+_SPLIT_RE = re.compile(r'[,;]')
+
+# The nutrient labels and their three accepted formats (plain, equals
+# sign, parentheses) are merged into one big alternation so extraction
+# walks the text once instead of once per label/format pair.
+_NUTRIENT_LABELS = {
+    'calories': 'calories',
+    'protein': 'protein',
+    'carbs': '(?:carb|carbohydrate)',
+    'fat': 'fat',
+    'fiber': 'fiber',
+    'sugar': 'sugar',
+    'sodium': 'sodium',
+}
+
+def _value_alternatives(key: str, label: str) -> List[str]:
+    return [
+        rf'(?P<{key}_colon>{label}[:\s]*([\d.,]+)\s*(?:g|mg|mcg|μg|kg)?)',   # Standard format
+        rf'(?P<{key}_eq>{label}\s*=\s*([\d.,]+)\s*(?:g|mg|mcg|μg|kg)?)',     # With equals sign
+        rf'(?P<{key}_paren>{label}\s*\(([\d.,]+)\s*(?:g|mg|mcg|μg|kg)?\))',  # In parentheses
+    ]
+
+NUTRIENT_SCAN_RE = re.compile(
+    '|'.join(alt for key, label in _NUTRIENT_LABELS.items()
+             for alt in _value_alternatives(key, label)),
+    re.IGNORECASE)
+
+# Each named alternative maps to its nutrient field and the index of the
+# unnamed value group that directly follows it in the pattern.
+_SCAN_GROUPS = {name: (name.rsplit('_', 1)[0], idx + 1)
+                for name, idx in NUTRIENT_SCAN_RE.groupindex.items()}
+
+INGREDIENT_PATTERNS = [
+    re.compile(r'ingredients[:\s]*([^.]*?)(?:\.|$)', re.IGNORECASE),  # Until period or end
+    re.compile(r'contains[:\s]*([^.]*?)(?:\.|$)', re.IGNORECASE),     # Alternative format
+    re.compile(r'ingredients[:\s]*([^;]*?)(?:;|$)', re.IGNORECASE),   # Until semicolon or end
+]
+
+SERVING_PATTERNS = [
+    re.compile(r'serving size[:\s]*([^.]*?)(?:\.|$)', re.IGNORECASE),
+    re.compile(r'serving[:\s]*([^.]*?)(?:\.|$)', re.IGNORECASE),
+    re.compile(r'per serving[:\s]*([^.]*?)(?:\.|$)', re.IGNORECASE),
+]
+
 def normalize_unit(value: str) -> float:
     """Convert various unit formats to standard values"""
     value = value.lower().strip()
     # Remove any non-numeric characters except decimal point
-    numeric = re.sub(r'[^\d.]', '', value)
+    numeric = _NONNUM_RE.sub('', value)
     if not numeric:
         return 0.0
     
@@ -27,45 +73,28 @@ def normalize_unit(value: str) -> float:
 def extract_nutrition(text: str) -> Dict[str, Union[float, str, List[str]]]:
     """Extract nutrition information from text using improved pattern matching"""
     
-    def get_value(label: str, default: float = 0.0) -> float:
-        # Try different patterns for the label
-        patterns = [
-            rf'{label}[:\s]*([\d.,]+)\s*(?:g|mg|mcg|μg|kg)?',  # Standard format
-            rf'{label}\s*=\s*([\d.,]+)\s*(?:g|mg|mcg|μg|kg)?',  # With equals sign
-            rf'{label}\s*\(([\d.,]+)\s*(?:g|mg|mcg|μg|kg)?\)',  # In parentheses
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return normalize_unit(match.group(1))
-        return default
+    def get_values() -> Dict[str, float]:
+        # Single pass over the text; the first hit per nutrient wins
+        values: Dict[str, float] = {}
+        for match in NUTRIENT_SCAN_RE.finditer(text):
+            key, value_group = _SCAN_GROUPS[match.lastgroup]
+            if key not in values:
+                values[key] = normalize_unit(match.group(value_group))
+        return values
 
     def get_ingredients() -> List[str]:
         # Look for ingredients section
-        patterns = [
-            r'ingredients[:\s]*([^.]*?)(?:\.|$)',  # Until period or end
-            r'contains[:\s]*([^.]*?)(?:\.|$)',     # Alternative format
-            r'ingredients[:\s]*([^;]*?)(?:;|$)',   # Until semicolon or end
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in INGREDIENT_PATTERNS:
+            match = pattern.search(text)
             if match:
                 # Split by common separators and clean up
-                ingredients = re.split(r'[,;]', match.group(1))
+                ingredients = _SPLIT_RE.split(match.group(1))
                 return [i.strip() for i in ingredients if i.strip()]
         return []
 
     def get_serving_size() -> str:
-        patterns = [
-            r'serving size[:\s]*([^.]*?)(?:\.|$)',
-            r'serving[:\s]*([^.]*?)(?:\.|$)',
-            r'per serving[:\s]*([^.]*?)(?:\.|$)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in SERVING_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return ''
@@ -137,18 +166,11 @@ def extract_nutrition(text: str) -> Dict[str, Union[float, str, List[str]]]:
             
         return warnings, benefits
 
-    # Extract basic nutrition values
-    nutrition = {
-        'calories': get_value('calories'),
-        'protein': get_value('protein'),
-        'carbs': get_value('carb|carbohydrate'),
-        'fat': get_value('fat'),
-        'fiber': get_value('fiber'),
-        'sugar': get_value('sugar'),
-        'sodium': get_value('sodium'),
-        'ingredients': get_ingredients(),
-        'serving_size': get_serving_size(),
-    }
+    # Extract basic nutrition values in one scan
+    values = get_values()
+    nutrition = {key: values.get(key, 0.0) for key in _NUTRIENT_LABELS}
+    nutrition['ingredients'] = get_ingredients()
+    nutrition['serving_size'] = get_serving_size()
     
     # Calculate health score
     nutrition['health_score'] = calculate_health_score(nutrition)
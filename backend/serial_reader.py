@@ -1,6 +1,6 @@
 import serial
 import serial.tools.list_ports
-import json
+import orjson
 import time
 import threading
 import sys
@@ -116,19 +116,21 @@ class SerialReader:
             self.serial_port.reset_input_buffer()
             self.serial_port.reset_output_buffer()
             
-            with self.connection_lock:
-                self.latest_data['connected'] = True
-                self.latest_data['lastUpdate'] = datetime.now().strftime('%H:%M:%S')
-                if self.last_good_data:
-                    self.latest_data.update(self.last_good_data)
+            new_state = dict(self.latest_data)
+            if self.last_good_data:
+                new_state.update(self.last_good_data)
+            new_state['connected'] = True
+            new_state['lastUpdate'] = datetime.now().strftime('%H:%M:%S')
+            self.latest_data = new_state
             self.port_initialized = True
             return True
-            
+
         except Exception as e:
-            with self.connection_lock:
-                if self.last_good_data:
-                    self.latest_data.update(self.last_good_data)
-                self.latest_data['connected'] = False
+            new_state = dict(self.latest_data)
+            if self.last_good_data:
+                new_state.update(self.last_good_data)
+            new_state['connected'] = False
+            self.latest_data = new_state
             self.port_initialized = False
             return False
 
@@ -183,7 +185,11 @@ class SerialReader:
                         self.last_read_time = time.time()
                     except:
                         continue
-                
+                else:
+                    # Idle port: sleep briefly instead of spinning on
+                    # in_waiting and burning a core
+                    time.sleep(0.05)
+
                 # Check for timeout
                 if time.time() - self.last_read_time > 10:  # 10 seconds timeout
                     self._cleanup_port()
@@ -199,21 +205,26 @@ class SerialReader:
     def _process_data(self, data_str):
         """Process and validate the received data"""
         try:
-            data = json.loads(data_str)
+            # orjson's SIMD scanner is markedly faster than stdlib json for
+            # the small sensor payloads this loop parses on every tick
+            data = orjson.loads(data_str)
             
             if 'temperature' in data and 'humidity' in data:
-                with self.connection_lock:
-                    new_data = {
-                        'temperature': float(data['temperature']),
-                        'humidity': float(data['humidity']),
-                        'lastUpdate': datetime.now().strftime('%H:%M:%S'),
-                        'connected': True
-                    }
-                    self.latest_data.update(new_data)
-                    self.last_good_data = {
-                        'temperature': float(data['temperature']),
-                        'humidity': float(data['humidity'])
-                    }
+                temperature = float(data['temperature'])
+                humidity = float(data['humidity'])
+                # Build a fresh snapshot and rebind the reference in one
+                # store: rebinding is atomic under the GIL, so readers always
+                # see a complete, consistent reading without taking a lock
+                self.latest_data = {
+                    'temperature': temperature,
+                    'humidity': humidity,
+                    'lastUpdate': datetime.now().strftime('%H:%M:%S'),
+                    'connected': True
+                }
+                self.last_good_data = {
+                    'temperature': temperature,
+                    'humidity': humidity
+                }
                 print(f"Temperature: {data['temperature']}°C, Humidity: {data['humidity']}% | SerialReader instance id (in thread): {id(self)}")
         except:
             pass
@@ -233,9 +244,12 @@ class SerialReader:
                     time.sleep(1)
 
     def get_latest_data(self):
-        """Thread-safe method to get the latest data"""
-        with self.connection_lock:
-            return self.latest_data.copy()
+        """Get the latest data snapshot.
+
+        The reader thread only ever swaps in whole dicts, so grabbing the
+        reference is safe without a lock; treat the result as read-only.
+        """
+        return self.latest_data
 
     def stop(self):
         """Cleanup method for Flask app context"""